@@ -9,6 +9,7 @@ Runs Schemathesis against the OpenAPI spec to detect:
 
 Usage:
     python scripts/api_fuzzing.py [--base-url URL] [--spec-path PATH]
+                                  [--workers N] [--max-examples N]
 
 The script expects the Spring Boot app to already be running, or it will
 start one in the background and shut it down when done.
@@ -20,20 +21,31 @@ Exit codes:
 """
 
 import argparse
+import hashlib
+import http.client
+import importlib.metadata
 import os
 import signal
 import subprocess
 import sys
+import threading
 import time
-import urllib.request
 import urllib.error
+import urllib.parse
+import urllib.request
 from pathlib import Path
+from typing import List, Optional
 
 # Default configuration
 DEFAULT_BASE_URL = "http://localhost:8080"
 DEFAULT_SPEC_PATH = "/v3/api-docs"
 DEFAULT_TIMEOUT = 120  # seconds to wait for app startup
-HEALTH_CHECK_INTERVAL = 2  # seconds between health checks
+INITIAL_POLL_INTERVAL = 0.1  # first delay between health checks (seconds)
+MAX_POLL_INTERVAL = 1.0  # backoff ceiling between health checks (seconds)
+MAX_WORKERS = 8  # cap so the backend under test is not overwhelmed
+DEFAULT_WORKERS = min(MAX_WORKERS, os.cpu_count() or 1)
+FUZZING_TIMEOUT = 600  # 10 minute timeout for entire fuzzing run
+OUTPUT_CHUNK_SIZE = 64 * 1024  # max bytes relayed per write when output is piped
 
 
 def log(message: str, level: str = "INFO") -> None:
@@ -43,7 +55,20 @@ def log(message: str, level: str = "INFO") -> None:
 
 
 def check_schemathesis_installed() -> bool:
-    """Verify Schemathesis is installed."""
+    """
+    Verify Schemathesis is installed.
+
+    Reads the installed package metadata first, which avoids spawning a
+    process (and importing Schemathesis) just to print a version. Falls back
+    to ``schemathesis --version`` for installs outside this interpreter
+    (e.g. pipx).
+    """
+    try:
+        log(f"Schemathesis version: {importlib.metadata.version('schemathesis')}")
+        return True
+    except importlib.metadata.PackageNotFoundError:
+        pass
+
     try:
         result = subprocess.run(
             ["schemathesis", "--version"],
@@ -61,29 +86,57 @@ def check_schemathesis_installed() -> bool:
     return False
 
 
-def wait_for_app(base_url: str, timeout: int) -> bool:
+def _open_connection(parts: urllib.parse.SplitResult) -> http.client.HTTPConnection:
+    """Create a (lazily connected) HTTP(S) connection for the given URL parts."""
+    if parts.scheme == "https":
+        return http.client.HTTPSConnection(parts.hostname, parts.port, timeout=5)
+    return http.client.HTTPConnection(parts.hostname, parts.port, timeout=5)
+
+
+def wait_for_app(
+    base_url: str,
+    timeout: int,
+    process: Optional[subprocess.Popen] = None,
+) -> bool:
     """
     Wait for the Spring Boot app to be ready.
 
-    Polls the health endpoint until it returns 200 or timeout is reached.
+    Polls the health endpoint until it returns 200 or timeout is reached. The
+    poll interval backs off exponentially so a fast startup is noticed within
+    ~100ms, and one keep-alive connection is reused across probes. If the app
+    was started by this script, an early exit of that process ends the wait.
     """
     health_url = f"{base_url}/actuator/health"
-    start_time = time.time()
+    parts = urllib.parse.urlsplit(health_url)
+    deadline = time.monotonic() + timeout
+    delay = INITIAL_POLL_INTERVAL
+    conn = _open_connection(parts)
 
     log(f"Waiting for app at {health_url} (timeout: {timeout}s)")
 
-    while time.time() - start_time < timeout:
-        try:
-            with urllib.request.urlopen(health_url, timeout=5) as response:
+    try:
+        while time.monotonic() < deadline:
+            if process is not None and process.poll() is not None:
+                log(f"App process exited early (code {process.returncode})", "ERROR")
+                return False
+            try:
+                conn.request("GET", parts.path)
+                response = conn.getresponse()
+                response.read()
                 if response.status == 200:
                     log("App is ready (health check passed)")
                     return True
-        except urllib.error.URLError:
-            pass
-        except Exception as e:
-            log(f"Health check error: {e}", "DEBUG")
-
-        time.sleep(HEALTH_CHECK_INTERVAL)
+            except (ConnectionRefusedError, http.client.RemoteDisconnected):
+                # Not listening yet (or dropped the idle socket); reconnect next probe.
+                conn.close()
+            except (OSError, http.client.HTTPException) as e:
+                log(f"Health check error: {e}", "DEBUG")
+                conn.close()
+
+            time.sleep(delay)
+            delay = min(MAX_POLL_INTERVAL, delay * 1.5)
+    finally:
+        conn.close()
 
     log(f"Timeout waiting for app after {timeout}s", "ERROR")
     return False
@@ -137,31 +190,103 @@ def stop_spring_boot_app(process: subprocess.Popen) -> None:
         log(f"Error stopping app: {e}", "WARN")
 
 
+def _content_hash(data: bytes) -> str:
+    """Short content hash used as the spec's ETag."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
 def export_openapi_spec(base_url: str, spec_path: str, output_file: Path) -> bool:
     """
     Export the OpenAPI spec from the running app to a local file.
 
     This allows the spec to be archived as a CI artifact for ZAP or other tools.
+    An existing file is only rewritten when the spec content changed, so
+    content-addressed artifact caches downstream stay warm.
     """
     spec_url = f"{base_url}{spec_path}"
     log(f"Exporting OpenAPI spec from {spec_url}")
 
+    request = urllib.request.Request(spec_url)
+    existing_hash = None
     try:
-        with urllib.request.urlopen(spec_url, timeout=30) as response:
+        existing_hash = _content_hash(output_file.read_bytes())
+    except OSError:
+        pass  # missing or unreadable: export as if there were no previous spec
+    if existing_hash is not None:
+        request.add_header("If-None-Match", f'"{existing_hash}"')
+
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
             spec_content = response.read()
-            output_file.parent.mkdir(parents=True, exist_ok=True)
-            output_file.write_bytes(spec_content)
-            log(f"OpenAPI spec saved to {output_file}")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and existing_hash is not None:
+            log(f"OpenAPI spec unchanged (304), keeping {output_file}")
             return True
+        log(f"Failed to export OpenAPI spec: {e}", "ERROR")
+        return False
     except Exception as e:
         log(f"Failed to export OpenAPI spec: {e}", "ERROR")
         return False
 
+    if existing_hash is not None and _content_hash(spec_content) == existing_hash:
+        log(f"OpenAPI spec unchanged, keeping {output_file}")
+        return True
+
+    try:
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        output_file.write_bytes(spec_content)
+    except OSError as e:
+        log(f"Failed to export OpenAPI spec: {e}", "ERROR")
+        return False
+    log(f"OpenAPI spec saved to {output_file}")
+    return True
+
 
-def run_schemathesis(base_url: str, spec_path: str) -> int:
+def _run_forwarding_output(cmd: List[str], timeout: int) -> int:
+    """
+    Run ``cmd`` with stdout/stderr piped and forward them to our stdout.
+
+    Verbose runs write many small lines; relaying whatever has accumulated in
+    the pipe (up to OUTPUT_CHUNK_SIZE) per write keeps log output live while
+    cutting the number of write syscalls on CI.
+    """
+    process = subprocess.Popen(
+        cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, bufsize=OUTPUT_CHUNK_SIZE
+    )
+    out = sys.stdout.buffer
+
+    def _pump() -> None:
+        for chunk in iter(lambda: process.stdout.read1(OUTPUT_CHUNK_SIZE), b""):
+            out.write(chunk)
+            out.flush()
+
+    pump = threading.Thread(target=_pump, name="schemathesis-output", daemon=True)
+    pump.start()
+    try:
+        process.wait(timeout=timeout)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        pump.join(timeout=5)
+        process.stdout.close()
+    return process.returncode
+
+
+def run_schemathesis(
+    base_url: str,
+    spec_path: str,
+    workers: int = DEFAULT_WORKERS,
+    max_examples: Optional[int] = None,
+) -> int:
     """
     Run Schemathesis against the OpenAPI spec.
 
+    Fuzzing is dominated by HTTP round-trips, so operations are spread across
+    ``workers`` threads. Pass ``workers=1`` when the backend under test cannot
+    handle parallel load.
+
     Returns:
         0 if all tests pass
         1 if any tests fail (5xx errors, schema violations)
@@ -179,27 +304,33 @@ def run_schemathesis(base_url: str, spec_path: str) -> int:
     # Tomcat's connector level BEFORE reaching JsonErrorReportValve, returning HTML.
     # JsonErrorReportValve now sets explicit Content-Length to avoid chunked encoding
     # issues with malformed URLs. See ADR-0022 for details.
+    # The CLI is used instead of the Python API on purpose: the v3
+    # `schemathesis.runner` API was removed in v4 (its engine is internal),
+    # and a child process keeps the 10 minute timeout enforceable.
     cmd = [
         "schemathesis", "run",
         spec_url,
         "--checks", "not_a_server_error",
         "--checks", "response_schema_conformance",
+        "--workers", str(workers),
     ]
+    if max_examples is not None:
+        cmd += ["--max-examples", str(max_examples)]
 
     log(f"Command: {' '.join(cmd)}")
 
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=False,  # Stream output to console
-            timeout=600  # 10 minute timeout for entire fuzzing run
-        )
+        if sys.stdout.isatty():
+            # Interactive: let Schemathesis own the terminal (colors, progress).
+            returncode = subprocess.run(cmd, timeout=FUZZING_TIMEOUT).returncode
+        else:
+            returncode = _run_forwarding_output(cmd, FUZZING_TIMEOUT)
 
-        if result.returncode == 0:
+        if returncode == 0:
             log("Schemathesis completed successfully (no issues found)")
             return 0
         else:
-            log(f"Schemathesis found issues (exit code: {result.returncode})", "ERROR")
+            log(f"Schemathesis found issues (exit code: {returncode})", "ERROR")
             return 1
 
     except subprocess.TimeoutExpired:
@@ -210,6 +341,14 @@ def run_schemathesis(base_url: str, spec_path: str) -> int:
         return 2
 
 
+def _positive_int(value: str) -> int:
+    """argparse type for flags that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be >= 1, got {number}")
+    return number
+
+
 def main() -> int:
     """Main entry point for the API fuzzing script."""
     parser = argparse.ArgumentParser(
@@ -242,6 +381,18 @@ def main() -> int:
         help=f"Timeout for app startup in seconds (default: {DEFAULT_TIMEOUT})"
     )
 
+    parser.add_argument(
+        "--workers",
+        type=_positive_int,
+        default=DEFAULT_WORKERS,
+        help=f"Parallel Schemathesis workers; use 1 for fragile backends (default: {DEFAULT_WORKERS})"
+    )
+    parser.add_argument(
+        "--max-examples",
+        type=_positive_int,
+        help="Maximum generated examples per operation (default: Schemathesis default)"
+    )
+
     args = parser.parse_args()
 
     # Check dependencies
@@ -256,10 +407,9 @@ def main() -> int:
         # Start app if requested
         if args.start_app:
             app_process = start_spring_boot_app()
-            time.sleep(5)  # Give Maven time to start
 
         # Wait for app to be ready
-        if not wait_for_app(args.base_url, args.timeout):
+        if not wait_for_app(args.base_url, args.timeout, app_process):
             log("App is not responding. Is it running?", "ERROR")
             return 2
 
@@ -269,7 +419,9 @@ def main() -> int:
                 log("Failed to export OpenAPI spec, continuing with fuzzing", "WARN")
 
         # Run the fuzzing
-        exit_code = run_schemathesis(args.base_url, args.spec_path)
+        exit_code = run_schemathesis(
+            args.base_url, args.spec_path, args.workers, args.max_examples
+        )
 
     except KeyboardInterrupt:
         log("Interrupted by user", "WARN")
@@ -14,11 +14,25 @@ import os
 import sys
 import xml.etree.ElementTree as ET
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import shutil
 
+try:
+    # Optional C parser; Dependency-Check reports routinely reach tens of MB.
+    from orjson import loads as _json_loads
+except ImportError:  # CI runners only have the stdlib
+    _json_loads = json.loads
+
+try:
+    # Optional streaming parser for very large Dependency-Check reports.
+    import ijson
+except ImportError:
+    ijson = None
+
 
 # Repo root + Maven `target/` folder.
 ROOT = Path(__file__).resolve().parents[1]
@@ -66,19 +80,33 @@ def load_pitest() -> Optional[Dict[str, float]]:
     report = TARGET / "pit-reports" / "mutations.xml"
     if not report.exists():
         return None
+
+    # Stream the report in one pass: mutations are direct children of the
+    # root, so clearing the root after each one keeps memory constant.
+    total = killed = survived = detected = 0
+    root = None
     try:
-        tree = ET.parse(report)
+        with report.open("rb") as handle:
+            for event, elem in ET.iterparse(handle, events=("start", "end")):
+                if root is None:
+                    root = elem
+                if event != "end" or elem.tag != "mutation":
+                    continue
+                total += 1
+                status = elem.attrib.get("status")
+                if status == "KILLED":
+                    killed += 1
+                elif status == "SURVIVED":
+                    survived += 1
+                if elem.attrib.get("detected") == "true":
+                    detected += 1
+                root.clear()
     except ET.ParseError:
         return None
 
-    mutations = list(tree.getroot().iter("mutation"))
-    total = len(mutations)
     if total == 0:
         return {"total": 0, "killed": 0, "survived": 0, "detected": 0, "pct": 0.0}
 
-    killed = sum(1 for m in mutations if m.attrib.get("status") == "KILLED")
-    survived = sum(1 for m in mutations if m.attrib.get("status") == "SURVIVED")
-    detected = sum(1 for m in mutations if m.attrib.get("detected") == "true")
     return {
         "total": total,
         "killed": killed,
@@ -96,32 +124,34 @@ SEVERITY_LABELS = {
     "LOW": "🟩 Low",
     "UNKNOWN": "⬜ Unknown",
 }
+# Precomputed (label, level) and (level, json key) pairs for the summary and dashboard.
+_SEVERITY_PAIRS = tuple((SEVERITY_LABELS[level], level) for level in SEVERITY_ORDER)
+_SEVERITY_KEYS = tuple((level, level.lower()) for level in SEVERITY_ORDER)
 
 
-def load_dependency_check() -> Optional[Dict[str, object]]:
-    """Parse Dependency-Check JSON for vulnerability counts."""
-    report = TARGET / "dependency-check-report.json"
-    if not report.exists():
-        return None
-    try:
-        data = json.loads(report.read_text())
-    except json.JSONDecodeError:
-        return None
-
-    dependencies = data.get("dependencies", [])
-    dep_count = len(dependencies)
+def _count_dependencies(dependencies: Iterable[Dict[str, object]]) -> Dict[str, object]:
+    """Aggregate vulnerability counts from an iterable of dependency objects."""
+    dep_count = 0
     vulnerable_deps = 0
     vuln_total = 0
     severity_counts = defaultdict(int)
+    # Reports repeat a handful of raw severity strings thousands of times, so
+    # normalise each distinct value once.
+    normalized: Dict[object, str] = {}
     for dep in dependencies:
+        dep_count += 1
         vulns = dep.get("vulnerabilities") or []
         if vulns:
             vulnerable_deps += 1
             vuln_total += len(vulns)
             for vuln in vulns:
-                severity = (vuln.get("severity") or "UNKNOWN").upper()
-                if severity not in SEVERITY_ORDER:
-                    severity = "UNKNOWN"
+                raw = vuln.get("severity")
+                severity = normalized.get(raw)
+                if severity is None:
+                    severity = (raw or "UNKNOWN").upper()
+                    if severity not in SEVERITY_ORDER:
+                        severity = "UNKNOWN"
+                    normalized[raw] = severity
                 severity_counts[severity] += 1
 
     for key in SEVERITY_ORDER:
@@ -135,26 +165,77 @@ def load_dependency_check() -> Optional[Dict[str, object]]:
     }
 
 
+# Above this size (and when ijson is installed) the report is streamed one
+# dependency at a time instead of being materialised in full.
+DEPENDENCY_CHECK_STREAM_BYTES = 16 * 1024 * 1024
+
+
+def load_dependency_check() -> Optional[Dict[str, object]]:
+    """Parse Dependency-Check JSON for vulnerability counts."""
+    report = TARGET / "dependency-check-report.json"
+    if not report.exists():
+        return None
+
+    if ijson is not None and report.stat().st_size >= DEPENDENCY_CHECK_STREAM_BYTES:
+        try:
+            with report.open("rb") as handle:
+                return _count_dependencies(ijson.items(handle, "dependencies.item"))
+        except ijson.JSONError:
+            return None
+
+    try:
+        data = _json_loads(report.read_bytes())
+    except ValueError:  # JSONDecodeError / orjson.JSONDecodeError / bad encoding
+        return None
+    return _count_dependencies(data.get("dependencies", []))
+
+
+def _parse_surefire(xml_path: str) -> Optional[Tuple[int, int, int, int, float]]:
+    """Return (tests, failures, errors, skipped, time) from one Surefire report."""
+    # Only the root <testsuite> attributes matter, so stop at the first
+    # start event instead of building the whole tree (test cases, output).
+    try:
+        with open(xml_path, "rb") as handle:
+            _, root = next(ET.iterparse(handle, events=("start",)))
+    except (ET.ParseError, StopIteration):
+        return None
+    return (
+        int(root.attrib.get("tests", "0")),
+        int(root.attrib.get("failures", "0")),
+        int(root.attrib.get("errors", "0")),
+        int(root.attrib.get("skipped", "0")),
+        float(root.attrib.get("time", "0")),
+    )
+
+
 def load_surefire() -> Optional[Dict[str, float]]:
     """Aggregate JUnit results from Surefire XML reports."""
     report_dir = TARGET / "surefire-reports"
     if not report_dir.exists():
         return None
 
+    # scandir + prefix/suffix checks: no fnmatch per entry, and the file-type
+    # check comes from the directory entry rather than an extra stat.
+    with os.scandir(report_dir) as entries:
+        paths = [
+            entry.path
+            for entry in entries
+            if entry.name.startswith("TEST-") and entry.name.endswith(".xml") and entry.is_file()
+        ]
+    # Parsed serially: each file only yields its root start tag, so worker
+    # processes cost more to start than they save, even for hundreds of reports.
+    results = map(_parse_surefire, paths)
+
     total = failures = errors = skipped = 0
     times: List[float] = []
-
-    for xml_path in report_dir.glob("TEST-*.xml"):
-        try:
-            tree = ET.parse(xml_path)
-        except ET.ParseError:
+    for result in results:
+        if result is None:
             continue
-        root = tree.getroot()
-        total += int(root.attrib.get("tests", "0"))
-        failures += int(root.attrib.get("failures", "0"))
-        errors += int(root.attrib.get("errors", "0"))
-        skipped += int(root.attrib.get("skipped", "0"))
-        times.append(float(root.attrib.get("time", "0")))
+        total += result[0]
+        failures += result[1]
+        errors += result[2]
+        skipped += result[3]
+        times.append(result[4])
 
     if total == 0 and failures == 0 and errors == 0:
         return None
@@ -183,9 +264,16 @@ def load_spotbugs_count() -> Optional[int]:
     return None
 
 
-def bar(pct: float, width: int = 20) -> str:
+BAR_WIDTH = 20
+# Only BAR_WIDTH + 1 distinct bars exist at the default width, so build them once.
+_BARS = tuple("█" * filled + "░" * (BAR_WIDTH - filled) for filled in range(BAR_WIDTH + 1))
+
+
+def bar(pct: float, width: int = BAR_WIDTH) -> str:
     filled = int(round((pct / 100) * width))
     filled = max(0, min(width, filled))
+    if width == BAR_WIDTH:
+        return _BARS[filled]
     return "█" * filled + "░" * (width - filled)
 
 
@@ -202,10 +290,7 @@ def format_row(metric: str, value: str, detail: str) -> str:
 
 
 def severity_summary(counts: Dict[str, int]) -> str:
-    parts = []
-    for level in SEVERITY_ORDER:
-        parts.append(f"{SEVERITY_LABELS[level]}: {counts.get(level, 0)}")
-    return " &nbsp; ".join(parts)
+    return " &nbsp; ".join(f"{label}: {counts.get(level, 0)}" for label, level in _SEVERITY_PAIRS)
 
 
 def _normalize_tests(tests: Optional[Dict[str, float]]) -> Dict[str, float]:
@@ -247,9 +332,9 @@ def _normalize_dependency(dep: Optional[Dict[str, object]]) -> Dict[str, object]
         return {
             "scanned": 0,
             "vulnerableDeps": 0,
-            "vulnerabilities": {level.lower(): 0 for level in SEVERITY_ORDER},
+            "vulnerabilities": {key: 0 for _, key in _SEVERITY_KEYS},
         }
-    severity = {level.lower(): dep["severity"].get(level, 0) for level in SEVERITY_ORDER}
+    severity = {key: dep["severity"].get(level, 0) for level, key in _SEVERITY_KEYS}
     return {
         "scanned": dep["dependencies"],
         "vulnerableDeps": dep["vulnerable_dependencies"],
@@ -385,19 +470,103 @@ def _timeline(dep: Dict[str, object]) -> List[Dict[str, object]]:
     return timeline
 
 
-def write_dashboard(
+def _summary_rows(
+        tests: Optional[Dict[str, float]],
+        jacoco: Optional[Dict[str, float]],
+        pit: Optional[Dict[str, float]],
+        dep: Optional[Dict[str, object]],
+        mutation: Dict[str, float],
+) -> List[str]:
+    """Markdown table rows for the job summary (missing reports get a placeholder row)."""
+    rows: List[str] = []
+    if tests:
+        rows.append(
+            format_row(
+                "Tests",
+                f"{tests['tests']} executed",
+                f"Total runtime {tests['time']}s; failures: {tests['failures']}, errors: {tests['errors']}, skipped: {tests['skipped']}",
+            )
+        )
+    else:
+        rows.append(format_row("Tests", "_no data_", "Surefire reports not found."))
+
+    if jacoco:
+        coverage_text = f"{jacoco['pct']}%".ljust(8) + bar(jacoco['pct'])
+        detail = f"{jacoco['covered']} / {jacoco['total']} lines covered"
+        rows.append(format_row("Line coverage (JaCoCo)", coverage_text, detail))
+    else:
+        rows.append(format_row("Line coverage (JaCoCo)", "_no data_", "Jacoco XML report missing."))
+
+    if pit:
+        detail = (
+            f"{pit['killed']} killed, {pit['survived']} survived, "
+            f"{mutation['detected']} detected out of {pit['total']} mutations"
+        )
+        rows.append(
+            format_row("Mutation score (PITest)", f"{pit['pct']}%".ljust(8) + bar(pit['pct']), detail)
+        )
+    else:
+        rows.append(
+            format_row("Mutation score (PITest)", "_no data_", "PITest report not generated (likely skipped).")
+        )
+
+    if dep:
+        detail = (
+            f"{dep['vulnerable_dependencies']} dependencies with issues "
+            f"({dep['vulnerabilities']} vulnerabilities) out of {dep['dependencies']} scanned."
+        )
+        rows.append(format_row("Dependency-Check", "scan complete", detail))
+        rows.append(
+            format_row("Dependency severity", severity_summary(dep["severity"]), "")
+        )
+    else:
+        rows.append(
+            format_row(
+                "Dependency-Check",
+                "_not run_",
+                "Report missing (probably skipped when `NVD_API_KEY` was not provided).",
+            )
+        )
+
+    return rows
+
+
+@dataclass
+class MetricPresentation:
+    """Report data formatted once and shared by the job summary and the dashboard."""
+
+    summary_rows: List[str]
+    tests: Dict[str, float]
+    coverage: Dict[str, float]
+    mutation: Dict[str, float]
+    dependency: Dict[str, object]
+    console: List[str]
+
+
+def present(
         raw_tests: Optional[Dict[str, float]],
         raw_jacoco: Optional[Dict[str, float]],
         raw_pit: Optional[Dict[str, float]],
         raw_dep: Optional[Dict[str, object]],
-) -> None:
-    """Copy the React dashboard build (if available) and save metrics JSON."""
+) -> MetricPresentation:
+    """Normalize the raw report data and build every derived string in one place."""
     tests = _normalize_tests(raw_tests)
     coverage = _normalize_coverage(raw_jacoco)
     mutation = _normalize_mutation(raw_pit)
     dependency = _normalize_dependency(raw_dep)
-    console = _build_console_lines(tests, coverage, mutation, dependency)
-    timeline = _timeline(dependency)
+    return MetricPresentation(
+        summary_rows=_summary_rows(raw_tests, raw_jacoco, raw_pit, raw_dep, mutation),
+        tests=tests,
+        coverage=coverage,
+        mutation=mutation,
+        dependency=dependency,
+        console=_build_console_lines(tests, coverage, mutation, dependency),
+    )
+
+
+def write_dashboard(presentation: MetricPresentation) -> None:
+    """Copy the React dashboard build (if available) and save metrics JSON."""
+    timeline = _timeline(presentation.dependency)
 
     run_metadata = {
         "repo": os.environ.get("GITHUB_REPOSITORY", "contact-suite-spring-react"),
@@ -412,12 +581,12 @@ def write_dashboard(
 
     metrics = {
         "run": run_metadata,
-        "tests": tests,
-        "coverage": coverage,
-        "mutation": mutation,
-        "dependencyCheck": dependency,
+        "tests": presentation.tests,
+        "coverage": presentation.coverage,
+        "mutation": presentation.mutation,
+        "dependencyCheck": presentation.dependency,
         "timeline": timeline,
-        "console": console,
+        "console": presentation.console,
     }
 
     dashboard_dir = TARGET / "site" / "qa-dashboard"
@@ -439,62 +608,20 @@ def write_dashboard(
 
 
 def main() -> int:
-    summary_lines = [section_header(), "", "| Metric | Result | Details |", "| --- | --- | --- |"]
-
-    tests = load_surefire()
-    if tests:
-        summary_lines.append(
-            format_row(
-                "Tests",
-                f"{tests['tests']} executed",
-                f"Total runtime {tests['time']}s; failures: {tests['failures']}, errors: {tests['errors']}, skipped: {tests['skipped']}",
-            )
-        )
-    else:
-        summary_lines.append(format_row("Tests", "_no data_", "Surefire reports not found."))
-
-    jacoco = load_jacoco()
-    if jacoco:
-        coverage_text = f"{jacoco['pct']}%".ljust(8) + bar(jacoco['pct'])
-        detail = f"{jacoco['covered']} / {jacoco['total']} lines covered"
-        summary_lines.append(format_row("Line coverage (JaCoCo)", coverage_text, detail))
-    else:
-        summary_lines.append(format_row("Line coverage (JaCoCo)", "_no data_", "Jacoco XML report missing."))
-
-    pit = load_pitest()
-    if pit:
-        detail = (
-            f"{pit['killed']} killed, {pit['survived']} survived, "
-            f"{pit.get('detected', pit['killed'])} detected out of {pit['total']} mutations"
-        )
-        summary_lines.append(
-            format_row("Mutation score (PITest)", f"{pit['pct']}%".ljust(8) + bar(pit['pct']), detail)
-        )
-    else:
-        summary_lines.append(
-            format_row("Mutation score (PITest)", "_no data_", "PITest report not generated (likely skipped).")
-        )
-
-    dep = load_dependency_check()
-    spotbugs_count = load_spotbugs_count()
-    if dep:
-        detail = (
-            f"{dep['vulnerable_dependencies']} dependencies with issues "
-            f"({dep['vulnerabilities']} vulnerabilities) out of {dep['dependencies']} scanned."
-        )
-        summary_lines.append(format_row("Dependency-Check", "scan complete", detail))
-        summary_lines.append(
-            format_row("Dependency severity", severity_summary(dep["severity"]), "")
-        )
-    else:
-        summary_lines.append(
-            format_row(
-                "Dependency-Check",
-                "_not run_",
-                "Report missing (probably skipped when `NVD_API_KEY` was not provided).",
-            )
+    # The loaders are independent file reads + parses, so overlap their I/O.
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        f_tests = executor.submit(load_surefire)
+        f_jacoco = executor.submit(load_jacoco)
+        f_pit = executor.submit(load_pitest)
+        f_dep = executor.submit(load_dependency_check)
+        f_spotbugs = executor.submit(load_spotbugs_count)
+        tests, jacoco, pit, dep, spotbugs_count = (
+            f_tests.result(), f_jacoco.result(), f_pit.result(), f_dep.result(), f_spotbugs.result()
         )
 
+    presentation = present(tests, jacoco, pit, dep)
+    summary_lines = [section_header(), "", "| Metric | Result | Details |", "| --- | --- | --- |"]
+    summary_lines.extend(presentation.summary_rows)
     summary_lines.append("")
     summary_lines.append(
         "Interactive dashboard: `target/site/qa-dashboard/index.html` (packaged in the `quality-reports-*` artifact)."
@@ -511,7 +638,7 @@ def main() -> int:
     else:
         print(summary_text)
 
-    write_dashboard(tests, jacoco, pit, dep)
+    write_dashboard(presentation)
     maybe_update_badges(jacoco, pit, spotbugs_count, dep)
     return 0
 
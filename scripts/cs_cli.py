@@ -57,6 +57,7 @@ from scripts.dev_stack import (
     _resolve_compose_command,
     _maybe_install_frontend,
     _attach_signal_handlers,
+    _wait_for_first_exit,
 )
 
 # Constants
@@ -271,13 +272,10 @@ def dev(
         console.print(table)
         console.print("\n[dim]Press Ctrl+C to stop all services[/dim]\n")
 
-        # Keep running until interrupted
-        while True:
-            for name, proc in running:
-                if proc.poll() is not None:
-                    console.print(f"[red]{name} exited with code {proc.returncode}[/red]")
-                    raise typer.Exit(1)
-            time.sleep(1)
+        # Keep running until interrupted or a service exits
+        name, proc = _wait_for_first_exit(running)
+        console.print(f"[red]{name} exited with code {proc.returncode}[/red]")
+        raise typer.Exit(1)
 
     except KeyboardInterrupt:
         console.print("\n[yellow]Shutting down...[/yellow]")
@@ -10,18 +10,27 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import queue
 import shlex
 import signal
 import subprocess
 import sys
+import threading
 import time
 from pathlib import Path
 from typing import Dict, List, Sequence, Tuple
-from urllib.error import URLError
-from urllib.request import urlopen
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.parse import urlsplit
 
 ROOT = Path(__file__).resolve().parents[1]
 FRONTEND_DIR = ROOT / "ui" / "contact-app"
+INSTALL_SENTINEL = ".install_ok"
+# Actuator serializes the overall status first; nested components also carry a
+# "status" key, so only a prefix match counts.
+_UP_PREFIX = b'{"status":"UP"'
+EXIT_WAIT_SLICE = 0.5  # seconds the main thread blocks before re-checking for Ctrl+C
+# Windows may not allow registering SIGTERM, so only trap Ctrl+C there.
+_SHUTDOWN_SIGNALS = (signal.SIGINT,) if os.name == "nt" else (signal.SIGINT, signal.SIGTERM)
 
 
 def _run(cmd: Sequence[str], *, cwd: Path) -> None:
@@ -33,30 +42,57 @@ def _wait_for_backend(url: str, timeout: int) -> None:
     """
     Poll the health endpoint until Spring reports UP or the timeout elapses.
     Raises RuntimeError so the launcher can tear everything down on failure.
+
+    One keep-alive connection is reused across probes and only reopened after
+    the backend refuses or drops it.
     """
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    connection_cls = HTTPSConnection if parts.scheme == "https" else HTTPConnection
+    conn = connection_cls(parts.hostname, parts.port, timeout=5)  # nosec - local dev only
+
     deadline = time.time() + timeout
-    while time.time() < deadline:
-        try:
-            with urlopen(url) as response:  # nosec - local dev only
+    try:
+        while time.time() < deadline:
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                body = response.read()
                 if response.status == 200:
-                    payload = json.loads(response.read().decode("utf-8"))
+                    # Actuator's compact JSON matches the byte check; only
+                    # parse when it doesn't (e.g. pretty-printed output).
+                    if body.startswith(_UP_PREFIX):
+                        return
+                    payload = json.loads(body.decode("utf-8"))
                     if payload.get("status") == "UP":
                         return
-        except URLError:
-            pass
-        except json.JSONDecodeError:
-            pass
-        time.sleep(1)
+            except (OSError, HTTPException):
+                # Refused/reset/timed out: drop the socket, reconnect on the next probe.
+                conn.close()
+            except json.JSONDecodeError:
+                pass
+            time.sleep(1)
+    finally:
+        conn.close()
     raise RuntimeError(f"Backend did not become healthy within {timeout} seconds at {url}")
 
 
 def _maybe_install_frontend(skip_install: bool) -> None:
-    """Install npm dependencies the first time the UI runs (no-op if node_modules exists)."""
-    node_modules = FRONTEND_DIR / "node_modules"
-    if skip_install or node_modules.exists():
+    """
+    Install npm dependencies the first time the UI runs.
+
+    A sentinel file written after a successful install marks node_modules as
+    complete, so an interrupted install is retried and deleting the sentinel
+    forces a reinstall.
+    """
+    sentinel = FRONTEND_DIR / "node_modules" / INSTALL_SENTINEL
+    if skip_install or sentinel.exists():
         return
     print("[dev-stack] Installing frontend dependencies (npm install)...", flush=True)
     _run(["npm", "install"], cwd=FRONTEND_DIR)
+    sentinel.touch()
 
 
 def _start_process(cmd: Sequence[str], *, cwd: Path, env: Dict[str, str] | None = None) -> subprocess.Popen:
@@ -64,6 +100,30 @@ def _start_process(cmd: Sequence[str], *, cwd: Path, env: Dict[str, str] | None
     return subprocess.Popen(cmd, cwd=str(cwd), env=env)
 
 
+def _wait_for_first_exit(children: Sequence[Tuple[str, subprocess.Popen]]) -> Tuple[str, subprocess.Popen]:
+    """
+    Block until one of the child processes exits and return it.
+
+    Each child gets a daemon thread parked in Popen.wait(), so the caller sleeps
+    until an exit actually happens instead of polling the children.
+    """
+    exited: queue.Queue[Tuple[str, subprocess.Popen]] = queue.Queue()
+
+    def _watch(name: str, proc: subprocess.Popen) -> None:
+        proc.wait()
+        exited.put((name, proc))
+
+    for name, proc in children:
+        threading.Thread(target=_watch, args=(name, proc), name=f"watch-{name}", daemon=True).start()
+    while True:
+        try:
+            # Bounded waits: on Windows a blocking lock acquire is not
+            # interrupted by Ctrl+C, so the main thread must wake periodically.
+            return exited.get(timeout=EXIT_WAIT_SLICE)
+        except queue.Empty:
+            continue
+
+
 def _attach_signal_handlers(children: List[Tuple[str, subprocess.Popen]]) -> None:
     """Ensure Ctrl+C or SIGTERM stops both processes cleanly."""
 
@@ -80,12 +140,8 @@ def _attach_signal_handlers(children: List[Tuple[str, subprocess.Popen]]) -> Non
                 proc.kill()
         sys.exit(0)
 
-    for sig in (signal.SIGINT, signal.SIGTERM):
-        try:
-            signal.signal(sig, _shutdown)
-        except ValueError:
-            # Windows may not allow registering SIGTERM, so just skip.
-            continue
+    for sig in _SHUTDOWN_SIGNALS:
+        signal.signal(sig, _shutdown)
 
 
 def parse_args() -> argparse.Namespace:
@@ -262,11 +318,8 @@ def main() -> None:
     )
 
     try:
-        while True:
-            for name, proc in running:
-                if proc.poll() is not None:
-                    raise RuntimeError(f"{name} process exited with code {proc.returncode}")
-            time.sleep(1)
+        name, proc = _wait_for_first_exit(running)
+        raise RuntimeError(f"{name} process exited with code {proc.returncode}")
     except KeyboardInterrupt:
         pass
     finally:
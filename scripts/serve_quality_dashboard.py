@@ -9,70 +9,584 @@ Usage:
 
 from __future__ import annotations
 
-import argparse
-import contextlib
+import datetime
+import email.utils
+import functools
+import gzip
+import hashlib
 import http.server
+import mimetypes
+import mmap
 import os
+import posixpath
+import re
+import shutil
 import socket
 import socketserver
 import sys
 import threading
-import webbrowser
+import time
+import types
+import urllib.parse
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Iterator, List, NoReturn, Optional, Tuple, Union
+
+try:
+    # Optional: Brotli variants are served to browsers that accept "br".
+    import brotli
+except ImportError:
+    brotli = None
 
 
 ROOT = Path(__file__).resolve().parents[1]
 DEFAULT_SITE = ROOT / "target" / "site"
 
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Serve the QA dashboard artifact locally.")
-    parser.add_argument(
-        "--path",
-        type=Path,
-        default=DEFAULT_SITE,
-        help="Path to the target/site directory (default: %(default)s)",
-    )
-    parser.add_argument(
-        "--port",
-        type=int,
-        default=0,
-        help="Port to bind (default: auto-pick an open port).",
-    )
-    return parser.parse_args()
-
-
-def pick_port(desired: int) -> int:
-    if desired:
-        return desired
-    with contextlib.closing(socket.socket(socket.AF_INET, socket.SOCK_STREAM)) as sock:
-        sock.bind(("", 0))
-        return sock.getsockname()[1]
-
-
-def serve_dashboard(site_dir: Path, port: int) -> None:
+USAGE = f"""usage: serve_quality_dashboard.py [-h] [--path PATH] [--port PORT]
+
+Serve the QA dashboard artifact locally.
+
+options:
+  -h, --help   show this help message and exit
+  --path PATH  Path to the target/site directory (default: {DEFAULT_SITE})
+  --port PORT  Port to bind (default: auto-pick an open port).
+"""
+
+
+def _usage_error(message: str) -> NoReturn:
+    sys.stderr.write(USAGE.split("\n", 1)[0] + "\n")
+    sys.stderr.write(f"serve_quality_dashboard.py: error: {message}\n")
+    raise SystemExit(2)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> types.SimpleNamespace:
+    """
+    Parse ``--path`` and ``--port`` by hand. The preview is started from a
+    downloaded artifact on every run, and argparse (with its gettext/textwrap
+    imports) is a noticeable share of startup for two options.
+    """
+    args = types.SimpleNamespace(path=DEFAULT_SITE, port=0)
+    remaining = list(sys.argv[1:] if argv is None else argv)
+    while remaining:
+        arg = remaining.pop(0)
+        if arg in ("-h", "--help"):
+            sys.stdout.write(USAGE)
+            raise SystemExit(0)
+        name, sep, value = arg.partition("=")
+        if name not in ("--path", "--port"):
+            _usage_error(f"unrecognized arguments: {arg}")
+        if not sep:
+            if not remaining:
+                _usage_error(f"argument {name}: expected one argument")
+            value = remaining.pop(0)
+        if name == "--path":
+            args.path = Path(value)
+        else:
+            try:
+                args.port = int(value)
+            except ValueError:
+                _usage_error(f"argument --port: invalid int value: {value!r}")
+    return args
+
+
+# The preview is for the person who downloaded the artifact; nothing else on
+# the network should be able to reach it.
+LOOPBACK = "127.0.0.1"
+
+
+def pick_port(desired: int) -> socket.socket:
+    """
+    Bind the listening socket up front (``desired`` or, if 0, any free port)
+    and hand it to the server, so no other process can take the port between
+    choosing it and serving on it.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        if os.name != "nt":
+            # Rebind straight after a restart despite TIME_WAIT; on Windows the
+            # option would instead let another process share the port.
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((LOOPBACK, desired))
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+PRELOAD_MAX_BYTES = 32 * 1024 * 1024
+SEND_BUFFER_BYTES = 1 << 20
+# Bodies up to this size are sent in the same write as their headers.
+SINGLE_WRITE_MAX_BYTES = 64 * 1024
+# Text assets worth compressing up front; images/fonts are already compressed.
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt", ".xml"}
+
+
+# Content-hashed names (name.<hex>.ext) and static asset folders never change
+# within a build: Vite emits hashed files under assets/, and the Maven site
+# keeps its skin under css/, images/ and webjars/.
+FINGERPRINTED_ASSET = re.compile(
+    r"(?:\.[0-9a-f]{8,}\.(?:js|css|png|svg|woff2?)$)|(?:(?:^|/)(?:assets|css|images|webjars)/)"
+)
+CACHE_IMMUTABLE = "public, max-age=31556952, immutable"
+# Everything else (index.html, metrics.json, report pages) is revalidated.
+CACHE_REVALIDATE = "no-cache"
+
+
+@dataclass
+class Entry:
+    """
+    A site file resolved once at startup. Files up to PRELOAD_MAX_BYTES are
+    served from memory; larger ones have no body and are streamed from `path`.
+    """
+
+    path: str
+    size: int
+    body: Optional[Union[mmap.mmap, bytes]]
+    etag: str
+    content_type: str
+    gzip: Optional[bytes]
+    br: Optional[bytes]
+    # Strong validators must differ per content-coding, so each precompressed
+    # variant carries its own tag (None when the variant does not exist).
+    etag_gzip: Optional[str]
+    etag_br: Optional[str]
+    mtime: int
+    last_modified: str
+    cache_control: str
+
+
+def _variant_etag(etag: str, suffix: str) -> str:
+    return f'{etag[:-1]}-{suffix}"'
+
+
+def _smaller(compressed: bytes, original: Union[mmap.mmap, bytes]) -> Optional[bytes]:
+    return compressed if len(compressed) < len(original) else None
+
+
+def _accepted_encodings(header: str) -> Dict[str, float]:
+    """Parse Accept-Encoding into {coding: q}; codings with q=0 are refused."""
+    accepted: Dict[str, float] = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def parse_byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into an inclusive (start, end) pair.
+
+    Returns None when the header should be ignored (malformed, another unit,
+    or several ranges, which are answered with the whole body) and raises
+    ValueError when the range cannot be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    first, sep, last = spec.strip().partition("-")
+    first, last = first.strip(), last.strip()
+    if unit.strip().lower() != "bytes" or not sep or not (first or last):
+        return None
+    if (first and not first.isdecimal()) or (last and not last.isdecimal()):
+        return None  # also covers multi-range lists such as "0-1,5-6"
+    if not first:
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise ValueError(f"unsatisfiable range {header!r}")
+        return max(0, size - suffix), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(f"unsatisfiable range {header!r}")
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def canonical_path(raw: str) -> Optional[str]:
+    """
+    Reduce a request target to its route-map key, or None if it contains a
+    ``..`` segment (browsers resolve those before sending, so only probes do).
+    Query and fragment are dropped, percent-escapes decoded and ``.``/``//``
+    collapsed; a trailing slash is kept so directory URLs still reach their
+    index.html.
+    """
+    path = urllib.parse.unquote(raw.split("?", 1)[0].split("#", 1)[0])
+    if ".." in path.split("/"):
+        return None
+    normalised = posixpath.normpath(path)
+    if path.endswith("/") and not normalised.endswith("/"):
+        normalised += "/"
+    return normalised
+
+
+def _map_file(path: str) -> Union[mmap.mmap, bytes]:
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        return mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+    except ValueError:  # empty files cannot be mapped
+        return b""
+    finally:
+        os.close(fd)
+
+
+def _walk_files(directory: str, url_prefix: str = "/") -> Iterator[Tuple[str, os.DirEntry]]:
+    """Yield (url_path, DirEntry) for every file below ``directory``; directory symlinks are not followed."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path, f"{url_prefix}{entry.name}/")
+            elif entry.is_file():
+                yield url_prefix + entry.name, entry
+
+
+def preload_site(site_dir: Path) -> Dict[str, Entry]:
+    """
+    Map every file under ``site_dir`` (up to PRELOAD_MAX_BYTES) into memory,
+    keyed by URL path; directories are keyed by their trailing-slash path and
+    resolve to their index.html. The artifact is read-only while it is
+    previewed, so hashing and compressing once here keeps per-request work to
+    a dict lookup and a single write.
+    """
+    routes: Dict[str, Entry] = {}
+    for url_path, file_entry in _walk_files(os.fspath(site_dir)):
+        name, path = file_entry.name, file_entry.path
+        # Cached from the directory listing on Windows; one stat() elsewhere.
+        stat = file_entry.stat()
+        content_type = mimetypes.guess_type(name, strict=False)[0] or "application/octet-stream"
+        body = gzipped = brotlied = None
+        if stat.st_size > PRELOAD_MAX_BYTES:
+            # Too big to keep resident: validate on size and mtime instead of hashing.
+            etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        else:
+            body = _map_file(path)
+            etag = '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            if body and os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                data = bytes(body)
+                gzipped = _smaller(gzip.compress(data, compresslevel=6), body)
+                if brotli is not None:
+                    brotlied = _smaller(brotli.compress(data, quality=5), body)
+        entry = Entry(
+            path=path,
+            size=stat.st_size,
+            body=body,
+            etag=etag,
+            content_type=content_type,
+            gzip=gzipped,
+            br=brotlied,
+            etag_gzip=None if gzipped is None else _variant_etag(etag, "gz"),
+            etag_br=None if brotlied is None else _variant_etag(etag, "br"),
+            mtime=int(stat.st_mtime),
+            last_modified=email.utils.formatdate(stat.st_mtime, usegmt=True),
+            cache_control=CACHE_IMMUTABLE if FINGERPRINTED_ASSET.search(url_path) else CACHE_REVALIDATE,
+        )
+        routes[url_path] = entry
+        if name == "index.html":
+            routes[url_path[: -len(name)]] = entry
+    return routes
+
+
+class DashboardRequestHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Serves the site from the route map built by preload_site; paths not in
+    the map are 404s, so requests never touch the filesystem to resolve.
+
+    Speaks HTTP/1.1 so browsers reuse one connection for all dashboard assets
+    (every response carries Content-Length); connections idle for `timeout`
+    seconds are closed so they do not pin handler threads.
+    """
+
+    protocol_version = "HTTP/1.1"
+    timeout = 60
+    server_version = "qa-preview"
+    # (second, formatted Date) shared by all handler threads; replaced whole,
+    # so readers always see a consistent pair.
+    _date_cache: Tuple[int, str] = (-1, "")
+
+    def __init__(self, *args, routes: Dict[str, Entry], **kwargs) -> None:
+        self.routes = routes
+        super().__init__(*args, **kwargs)
+
+    def setup(self) -> None:
+        # Large bodies follow their headers in a separate write; without
+        # TCP_NODELAY, Nagle can hold that write back for a delayed ACK
+        # (~40 ms). A 1 MiB send buffer lets most assets leave in one send().
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.request.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_BYTES)
+        super().setup()
+
+    def log_request(self, code="-", size="-") -> None:
+        # No access log: a dashboard load is ~100 requests, and every stderr
+        # write takes a lock shared by all handler threads. Errors still go
+        # through log_error.
+        pass
+
+    def version_string(self) -> str:
+        return self.server_version
+
+    def date_time_string(self, timestamp: Optional[float] = None) -> str:
+        # Date has one-second resolution, so format it at most once a second.
+        if timestamp is not None:
+            return super().date_time_string(timestamp)
+        now = int(time.time())
+        second, formatted = DashboardRequestHandler._date_cache
+        if second != now:
+            formatted = email.utils.formatdate(now, usegmt=True)
+            DashboardRequestHandler._date_cache = (now, formatted)
+        return formatted
+
+    def address_string(self) -> str:
+        # The raw client IP; never a reverse DNS lookup while logging.
+        return self.client_address[0]
+
+    def do_GET(self) -> None:
+        entry = self._lookup()
+        if entry is not None:
+            self._send_entry(entry, include_body=True)
+
+    def do_HEAD(self) -> None:
+        entry = self._lookup()
+        if entry is not None:
+            self._send_entry(entry, include_body=False)
+
+    def _lookup(self) -> Optional[Entry]:
+        """Resolve the request path, answering rejections, redirects and 404s itself."""
+        path = canonical_path(self.path)
+        if path is None:
+            self.send_error(400, "Path escapes the site root")
+            return None
+        entry = self.routes.get(path)
+        if entry is not None:
+            return entry
+        if path + "/" in self.routes:
+            # Directory without its trailing slash: redirect so relative links resolve.
+            self.send_response(301)
+            self.send_header("Location", urllib.parse.quote(path) + "/")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+        else:
+            self.send_error(404, "File not found")
+        return None
+
+    def _negotiate(self, entry: Entry) -> Tuple[Optional[Union[mmap.mmap, bytes]], Optional[str]]:
+        """Pick the best precompressed variant the client accepts (br > gzip > identity)."""
+        if entry.gzip is None and entry.br is None:
+            return entry.body, None
+        accepted = _accepted_encodings(self.headers.get("Accept-Encoding", ""))
+        wildcard = accepted.get("*", 0.0)
+        for coding, variant in (("br", entry.br), ("gzip", entry.gzip)):
+            if variant is not None and accepted.get(coding, wildcard) > 0:
+                return variant, coding
+        return entry.body, None
+
+    def _not_modified(self, entry: Entry, etag: str) -> bool:
+        """
+        Evaluate If-None-Match (preferred) against ``etag``, the tag of the
+        variant selected for this request, or else If-Modified-Since.
+        """
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = {tag.strip() for tag in if_none_match.split(",")}
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=datetime.timezone.utc)
+            return entry.mtime <= since.timestamp()
+        return False
+
+    def _send_entry(self, entry: Entry, include_body: bool) -> None:
+        body, encoding = self._negotiate(entry)
+        etag = {"gzip": entry.etag_gzip, "br": entry.etag_br}.get(encoding) or entry.etag
+        if self._not_modified(entry, etag):
+            # The browser's cached copy is current: headers only, no body.
+            self.send_response(304)
+            self._send_validators(entry, etag)
+            self.end_headers()
+            return
+        range_header = self.headers.get("Range")
+        if range_header and self._if_range_matches(entry):
+            try:
+                byte_range = parse_byte_range(range_header, entry.size)
+            except ValueError:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{entry.size}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            if byte_range is not None:
+                self._send_range(entry, *byte_range, include_body=include_body)
+                return
+        self.send_response(200)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", str(entry.size if body is None else len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self._send_validators(entry, etag)
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        if not include_body:
+            self.end_headers()
+        elif body is None:
+            self.end_headers()
+            self._send_file(entry.path)
+        else:
+            self._end_headers_with_body(body)
+
+    def _if_range_matches(self, entry: Entry) -> bool:
+        """
+        A Range is only honoured if If-Range (when sent) is the identity ETag:
+        ranges are cut from identity bytes, so a tag from a compressed variant
+        or a date (shared by every variant) gets the full response instead.
+        """
+        if_range = self.headers.get("If-Range")
+        return if_range is None or if_range.strip() == entry.etag
+
+    def _send_range(self, entry: Entry, start: int, end: int, include_body: bool) -> None:
+        # Ranges always address the identity bytes, never a compressed variant.
+        length = end - start + 1
+        self.send_response(206)
+        self.send_header("Content-Type", entry.content_type)
+        self.send_header("Content-Length", str(length))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{entry.size}")
+        self._send_validators(entry, entry.etag)
+        if not include_body:
+            self.end_headers()
+        elif entry.body is None:
+            self.end_headers()
+            self._send_file(entry.path, start, length)
+        else:
+            # A memoryview slice of the mapping is not copied until it is written.
+            self._end_headers_with_body(memoryview(entry.body)[start : end + 1])
+
+    def _end_headers_with_body(self, body: Union[mmap.mmap, bytes, memoryview]) -> None:
+        """
+        Finish the headers and write ``body``. Small bodies are appended to
+        the buffered status line and headers so the whole response leaves in
+        one send(); larger ones are written separately rather than copied.
+        """
+        if len(body) <= SINGLE_WRITE_MAX_BYTES and self.request_version != "HTTP/0.9":
+            self._headers_buffer.extend((b"\r\n", body))
+            self.flush_headers()
+        else:
+            self.end_headers()
+            self.wfile.write(body)
+
+    def _send_validators(self, entry: Entry, etag: str) -> None:
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", entry.last_modified)
+        self.send_header("Cache-Control", entry.cache_control)
+        if entry.gzip is not None or entry.br is not None:
+            self.send_header("Vary", "Accept-Encoding")
+
+    def _send_file(self, path: str, offset: int = 0, count: Optional[int] = None) -> None:
+        # socket.sendfile() uses sendfile(2) for regular files, so bytes go from
+        # the page cache straight to the socket without a userspace copy. It
+        # falls back to a send() loop where sendfile is unavailable (Windows).
+        with open(path, "rb") as source:
+            self.connection.sendfile(source, offset, count)
+
+
+class DashboardServer(socketserver.ThreadingTCPServer):
+    """
+    Thread-per-connection server for the preview.
+
+    Handler threads are daemons: the server neither records nor joins them,
+    so there is no per-connection bookkeeping and Ctrl+C exits immediately
+    instead of waiting on idle browser connections.
+    """
+
+    daemon_threads = True
+
+    @classmethod
+    def from_socket(cls, sock: socket.socket, handler) -> "DashboardServer":
+        """Listen on a socket already bound by pick_port instead of binding again."""
+        server = cls(sock.getsockname(), handler, bind_and_activate=False)
+        server.socket.close()
+        server.socket = sock
+        server.server_address = sock.getsockname()
+        server.server_activate()
+        return server
+
+
+def open_browser(url: str) -> None:
+    """
+    Hand the URL to the desktop's opener without blocking the accept loop.
+    posix_spawn starts the opener without fork()ing this process's heap;
+    webbrowser (on a background thread) is the fallback when no opener exists.
+    """
+    if os.name == "nt":
+        try:
+            os.startfile(url)
+            return
+        except OSError:
+            pass
+    else:
+        opener = "open" if sys.platform == "darwin" else "xdg-open"
+        if hasattr(os, "posix_spawnp") and shutil.which(opener):
+            try:
+                # New session: Ctrl+C in this terminal must not reach the browser.
+                pid = os.posix_spawnp(opener, [opener, url], os.environ, setsid=True)
+            except OSError:
+                pass
+            else:
+                # Reap the opener when it exits so it does not linger as a zombie.
+                threading.Thread(target=os.waitpid, args=(pid, 0), daemon=True).start()
+                return
+    # Deferred: webbrowser pulls in subprocess and shlex, and only this
+    # fallback needs it.
+    import webbrowser
+
+    threading.Thread(target=webbrowser.open, args=(url,), daemon=True).start()
+
+
+def serve_dashboard(site_dir: Path, sock: socket.socket) -> None:
     if not site_dir.exists():
         raise FileNotFoundError(f"site directory {site_dir} does not exist")
 
-    handler = http.server.SimpleHTTPRequestHandler
-    os.chdir(site_dir)
-    with socketserver.ThreadingTCPServer(("", port), handler) as httpd:
+    routes = preload_site(site_dir)
+    handler = functools.partial(DashboardRequestHandler, routes=routes)
+    with DashboardServer.from_socket(sock, handler) as httpd:
         actual_port = httpd.server_address[1]
-        url = f"http://localhost:{actual_port}/qa-dashboard/index.html"
-        print(f"Serving {site_dir} at {url}")
+        url = f"http://{LOOPBACK}:{actual_port}/qa-dashboard/index.html"
+        print(f"Serving {site_dir} at {url} ({len(routes)} routes preloaded)")
         print("Press Ctrl+C to stop.")
-        threading.Thread(target=lambda: webbrowser.open(url), daemon=True).start()
+        open_browser(url)
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
             print("\nShutting down server...")
 
 
+def init_mimetypes() -> None:
+    """
+    Load the MIME tables once, before preloading, so content types are fixed
+    at startup. The Vite bundle is loaded as ES modules, which browsers refuse
+    unless served as JavaScript, and the Windows registry can map .js to
+    text/plain, so those extensions are pinned after the system tables load.
+    """
+    mimetypes.init()
+    mimetypes.add_type("text/javascript", ".js")
+    mimetypes.add_type("text/javascript", ".mjs")
+
+
 def main() -> int:
     args = parse_args()
-    port = pick_port(args.port)
+    init_mimetypes()
     try:
-        serve_dashboard(args.path.resolve(), port)
+        with pick_port(args.port) as sock:
+            serve_dashboard(args.path.resolve(), sock)
         return 0
     except Exception as exc:  # noqa: BLE001
         print(f"Error: {exc}", file=sys.stderr)
@@ -0,0 +1,103 @@
+"""
+Unit tests for api_fuzzing.py helpers.
+
+Tests cover:
+- OpenAPI spec export (If-None-Match / 304, unchanged and changed specs)
+- Export failures staying non-fatal
+"""
+
+import http.server
+import os
+import threading
+
+import pytest
+
+from scripts import api_fuzzing
+
+SPEC = b'{"openapi": "3.0.1", "paths": {}}'
+
+
+class _SpecHandler(http.server.BaseHTTPRequestHandler):
+    """Serves ``server.spec``; answers 304 to a matching tag when ``server.honor_etag`` is set."""
+
+    def do_GET(self):
+        spec = self.server.spec
+        etag = f'"{api_fuzzing._content_hash(spec)}"'
+        self.server.if_none_match = self.headers.get("If-None-Match")
+        if self.server.honor_etag and self.server.if_none_match == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(spec)))
+        self.end_headers()
+        self.wfile.write(spec)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def spec_server():
+    """A loopback server for /v3/api-docs; yields the server so tests can change the spec."""
+    httpd = http.server.HTTPServer(("127.0.0.1", 0), _SpecHandler)
+    httpd.spec = SPEC
+    httpd.honor_etag = False
+    httpd.if_none_match = None
+    httpd.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _export(spec_server, output_file):
+    return api_fuzzing.export_openapi_spec(spec_server.base_url, "/v3/api-docs", output_file)
+
+
+def _write_stale(output_file, content):
+    """Write ``content`` with an old mtime so rewrites are detectable."""
+    output_file.write_bytes(content)
+    os.utime(output_file, (1_000_000_000, 1_000_000_000))
+
+
+class TestExportOpenapiSpec:
+    """Tests for export_openapi_spec."""
+
+    def test_writes_new_spec(self, spec_server, tmp_path):
+        """Without an existing file the spec is written and no tag is sent."""
+        output_file = tmp_path / "reports" / "openapi.json"
+        assert _export(spec_server, output_file) is True
+        assert output_file.read_bytes() == SPEC
+        assert spec_server.if_none_match is None
+
+    def test_unchanged_spec_leaves_file_alone(self, spec_server, tmp_path):
+        """Identical content is not rewritten, so the mtime is preserved."""
+        output_file = tmp_path / "openapi.json"
+        _write_stale(output_file, SPEC)
+        assert _export(spec_server, output_file) is True
+        assert output_file.stat().st_mtime == 1_000_000_000
+        assert spec_server.if_none_match == f'"{api_fuzzing._content_hash(SPEC)}"'
+
+    def test_not_modified_keeps_file(self, spec_server, tmp_path):
+        """A 304 for the existing file's hash keeps it untouched."""
+        spec_server.honor_etag = True
+        output_file = tmp_path / "openapi.json"
+        _write_stale(output_file, SPEC)
+        assert _export(spec_server, output_file) is True
+        assert output_file.read_bytes() == SPEC
+        assert output_file.stat().st_mtime == 1_000_000_000
+
+    def test_changed_spec_is_rewritten(self, spec_server, tmp_path):
+        """A different spec replaces the existing file."""
+        spec_server.honor_etag = True
+        output_file = tmp_path / "openapi.json"
+        _write_stale(output_file, b'{"openapi": "3.0.0"}')
+        assert _export(spec_server, output_file) is True
+        assert output_file.read_bytes() == SPEC
+
+    def test_directory_output_returns_false(self, spec_server, tmp_path):
+        """A directory at the output path is logged and reported, not raised."""
+        assert _export(spec_server, tmp_path) is False
@@ -0,0 +1,203 @@
+"""
+Unit tests for ci_metrics_summary.py report parsing.
+
+Tests cover:
+- Surefire XML aggregation
+- PITest mutation counts
+- Dependency-Check vulnerability counts
+- Summary formatting helpers
+- Missing or malformed reports
+"""
+
+import json
+
+import pytest
+
+from scripts import ci_metrics_summary
+
+
+@pytest.fixture
+def target(tmp_path, monkeypatch):
+    """Point the script at an empty Maven target/ directory."""
+    monkeypatch.setattr(ci_metrics_summary, "TARGET", tmp_path)
+    return tmp_path
+
+
+def _write_surefire(report_dir, name, tests, failures=0, errors=0, skipped=0, time="1.5"):
+    report_dir.mkdir(parents=True, exist_ok=True)
+    (report_dir / name).write_text(
+        f'<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<testsuite name="{name}" tests="{tests}" failures="{failures}" '
+        f'errors="{errors}" skipped="{skipped}" time="{time}">\n'
+        f'  <testcase name="a" classname="x" time="0.1"/>\n'
+        f'</testsuite>\n',
+        encoding="utf-8",
+    )
+
+
+class TestLoadSurefire:
+    """Tests for load_surefire aggregation."""
+
+    def test_missing_directory_returns_none(self, target):
+        """No surefire-reports directory means no data."""
+        assert ci_metrics_summary.load_surefire() is None
+
+    def test_sums_root_attributes_across_files(self, target):
+        """Counts and runtimes are summed across every TEST-*.xml file."""
+        reports = target / "surefire-reports"
+        _write_surefire(reports, "TEST-A.xml", tests=5, failures=1, time="1.25")
+        _write_surefire(reports, "TEST-B.xml", tests=3, errors=1, skipped=1, time="0.75")
+
+        assert ci_metrics_summary.load_surefire() == {
+            "tests": 8,
+            "failures": 1,
+            "errors": 1,
+            "skipped": 1,
+            "time": 2.0,
+        }
+
+    def test_ignores_non_matching_and_malformed_files(self, target):
+        """Only TEST-*.xml files count, and unparsable ones are skipped."""
+        reports = target / "surefire-reports"
+        _write_surefire(reports, "TEST-A.xml", tests=2)
+        _write_surefire(reports, "A.xml", tests=100)
+        (reports / "TEST-broken.xml").write_text("not xml", encoding="utf-8")
+
+        result = ci_metrics_summary.load_surefire()
+        assert result is not None
+        assert result["tests"] == 2
+
+
+class TestLoadPitest:
+    """Tests for load_pitest mutation counting."""
+
+    def _write_mutations(self, target, body):
+        report_dir = target / "pit-reports"
+        report_dir.mkdir(parents=True)
+        (report_dir / "mutations.xml").write_text(
+            f'<?xml version="1.0" encoding="UTF-8"?>\n<mutations>{body}</mutations>\n',
+            encoding="utf-8",
+        )
+
+    def test_missing_report_returns_none(self, target):
+        """No mutations.xml means no data."""
+        assert ci_metrics_summary.load_pitest() is None
+
+    def test_counts_statuses_in_single_pass(self, target):
+        """Killed, survived and detected are counted from mutation attributes."""
+        self._write_mutations(
+            target,
+            '<mutation detected="true" status="KILLED"><sourceFile>A.java</sourceFile></mutation>'
+            '<mutation detected="true" status="KILLED"><sourceFile>A.java</sourceFile></mutation>'
+            '<mutation detected="false" status="SURVIVED"><sourceFile>B.java</sourceFile></mutation>'
+            '<mutation detected="false" status="NO_COVERAGE"><sourceFile>C.java</sourceFile></mutation>',
+        )
+
+        assert ci_metrics_summary.load_pitest() == {
+            "total": 4,
+            "killed": 2,
+            "survived": 1,
+            "detected": 2,
+            "pct": 50.0,
+        }
+
+    def test_empty_report_has_zero_score(self, target):
+        """A report without mutations yields zero counts."""
+        self._write_mutations(target, "")
+        assert ci_metrics_summary.load_pitest()["total"] == 0
+
+    def test_malformed_report_returns_none(self, target):
+        """A truncated report is treated as missing."""
+        self._write_mutations(target, '<mutation status="KILLED">')
+        assert ci_metrics_summary.load_pitest() is None
+
+
+class TestLoadDependencyCheck:
+    """Tests for load_dependency_check severity aggregation."""
+
+    def test_missing_report_returns_none(self, target):
+        """No Dependency-Check JSON means no data."""
+        assert ci_metrics_summary.load_dependency_check() is None
+
+    def test_counts_vulnerabilities_by_severity(self, target):
+        """Severities are upper-cased and unknown values bucketed as UNKNOWN."""
+        report = {
+            "dependencies": [
+                {"fileName": "a.jar", "vulnerabilities": [{"severity": "high"}, {"severity": "HIGH"}]},
+                {"fileName": "b.jar", "vulnerabilities": [{"severity": "moderate"}, {}]},
+                {"fileName": "c.jar"},
+            ]
+        }
+        (target / "dependency-check-report.json").write_text(json.dumps(report), encoding="utf-8")
+
+        result = ci_metrics_summary.load_dependency_check()
+        assert result["dependencies"] == 3
+        assert result["vulnerable_dependencies"] == 2
+        assert result["vulnerabilities"] == 4
+        assert result["severity"] == {"CRITICAL": 0, "HIGH": 2, "MEDIUM": 0, "LOW": 0, "UNKNOWN": 2}
+
+    def test_malformed_report_returns_none(self, target):
+        """Invalid JSON is treated as missing."""
+        (target / "dependency-check-report.json").write_text("{not json", encoding="utf-8")
+        assert ci_metrics_summary.load_dependency_check() is None
+
+    def test_streams_large_reports_with_ijson(self, target, monkeypatch):
+        """Reports above the streaming threshold give the same counts via ijson."""
+        pytest.importorskip("ijson")
+        monkeypatch.setattr(ci_metrics_summary, "DEPENDENCY_CHECK_STREAM_BYTES", 0)
+        report = {
+            "reportSchema": "1.1",
+            "dependencies": [
+                {"fileName": "a.jar", "vulnerabilities": [{"severity": "CRITICAL", "cvssv3": {"baseScore": 9.8}}]},
+                {"fileName": "b.jar", "vulnerabilities": []},
+            ],
+        }
+        (target / "dependency-check-report.json").write_text(json.dumps(report), encoding="utf-8")
+
+        result = ci_metrics_summary.load_dependency_check()
+        assert result["dependencies"] == 2
+        assert result["vulnerable_dependencies"] == 1
+        assert result["severity"]["CRITICAL"] == 1
+
+
+class TestSeveritySummary:
+    """Tests for severity_summary formatting."""
+
+    def test_lists_every_level_in_order(self):
+        """Every severity appears in order, defaulting to zero."""
+        summary = ci_metrics_summary.severity_summary({"HIGH": 2, "LOW": 1})
+        assert summary == (
+            "🟥 Critical: 0 &nbsp; 🟧 High: 2 &nbsp; 🟨 Medium: 0 &nbsp; 🟩 Low: 1 &nbsp; ⬜ Unknown: 0"
+        )
+
+
+class TestBar:
+    """Tests for the ASCII progress bar."""
+
+    @pytest.mark.parametrize("pct, filled", [(0, 0), (50, 10), (84.4, 17), (100, 20), (-5, 0), (150, 20)])
+    def test_default_width(self, pct, filled):
+        """Default-width bars are clamped and filled proportionally."""
+        assert ci_metrics_summary.bar(pct) == "█" * filled + "░" * (20 - filled)
+
+    def test_custom_width(self):
+        """Non-default widths are still supported."""
+        assert ci_metrics_summary.bar(50, width=4) == "██░░"
+
+
+class TestPresent:
+    """Tests for the shared MetricPresentation."""
+
+    def test_missing_reports_get_placeholder_rows(self):
+        """Every metric still has a summary row when no reports exist."""
+        presentation = ci_metrics_summary.present(None, None, None, None)
+        assert len(presentation.summary_rows) == 4
+        assert all("_no data_" in row or "_not run_" in row for row in presentation.summary_rows)
+        assert presentation.tests["total"] == 0
+        assert presentation.dependency["vulnerabilities"]["critical"] == 0
+
+    def test_summary_and_dashboard_share_mutation_counts(self):
+        """The job summary uses the same detected count as the dashboard."""
+        pit = {"total": 4, "killed": 3, "survived": 1, "pct": 75.0}
+        presentation = ci_metrics_summary.present(None, None, pit, None)
+        assert presentation.mutation["detected"] == 3
+        assert "3 detected out of 4 mutations" in presentation.summary_rows[2]
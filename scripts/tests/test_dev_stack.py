@@ -0,0 +1,104 @@
+"""
+Unit tests for dev_stack.py process and health helpers.
+
+Tests cover:
+- Backend health polling (compact UP, JSON fallback, nested component status)
+- Reusing one keep-alive connection across health probes
+- Waiting for the first child process to exit
+"""
+
+import http.server
+import subprocess
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+from scripts import dev_stack
+
+
+class _HealthHandler(http.server.BaseHTTPRequestHandler):
+    """Serves ``server.bodies`` in order (repeating the last) over keep-alive."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        server.clients.append(self.client_address)
+        body = server.bodies[min(len(server.clients), len(server.bodies)) - 1]
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def health_server():
+    """Start a loopback actuator stub; tests set ``bodies`` before polling."""
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _HealthHandler)
+    httpd.daemon_threads = True
+    httpd.bodies = [b'{"status":"UP"}']
+    httpd.clients = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/actuator/health"
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fast_probes(monkeypatch):
+    """Shrink the one-second pause between probes without touching the global time module."""
+    monkeypatch.setattr(dev_stack, "time", types.SimpleNamespace(time=time.time, sleep=lambda _: time.sleep(0.01)))
+
+
+class TestWaitForBackend:
+    """Tests for _wait_for_backend."""
+
+    def test_compact_up_returns(self, health_server, fast_probes):
+        """Actuator's compact payload matches the byte prefix."""
+        dev_stack._wait_for_backend(health_server.url, timeout=5)
+        assert len(health_server.clients) == 1
+
+    def test_status_after_other_keys_uses_json_fallback(self, health_server, fast_probes):
+        """UP is still recognised when "status" is not the first key."""
+        health_server.bodies = [b'{"groups":["liveness","readiness"],"status":"UP"}']
+        dev_stack._wait_for_backend(health_server.url, timeout=5)
+
+    def test_nested_up_with_overall_down_times_out(self, health_server, fast_probes):
+        """A component reporting UP does not count while the overall status is DOWN."""
+        health_server.bodies = [b'{"components":{"db":{"status":"UP"}},"status":"DOWN"}']
+        with pytest.raises(RuntimeError, match="did not become healthy"):
+            dev_stack._wait_for_backend(health_server.url, timeout=1)
+
+    def test_probes_reuse_one_connection(self, health_server, fast_probes):
+        """Repeated probes go over the same keep-alive socket."""
+        health_server.bodies = [b'{"status":"DOWN"}', b'{"status":"DOWN"}', b'{"status":"UP"}']
+        dev_stack._wait_for_backend(health_server.url, timeout=5)
+        assert len(health_server.clients) == 3
+        assert len(set(health_server.clients)) == 1
+
+
+class TestWaitForFirstExit:
+    """Tests for _wait_for_first_exit."""
+
+    def test_returns_first_child_to_exit(self):
+        """The child that exits first is returned with its return code."""
+        slow = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(3)"])
+        fast = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(3)"])
+        try:
+            name, proc = dev_stack._wait_for_first_exit([("slow", slow), ("fast", fast)])
+            assert name == "fast"
+            assert proc is fast
+            assert proc.returncode == 3
+            assert slow.poll() is None
+        finally:
+            slow.kill()
+            slow.wait()
@@ -0,0 +1,520 @@
+"""
+Unit tests for serve_quality_dashboard.py.
+
+Tests cover:
+- Command-line parsing
+- Binding the listening socket
+- Preloading the site tree into the route map
+- Request path canonicalisation
+- Serving preloaded files (content negotiation, HEAD, keep-alive, 404s)
+- Byte-range requests
+- Conditional GETs (ETag / Last-Modified)
+- Cache-Control policy
+- Opening the browser
+"""
+
+import contextlib
+import email.utils
+import functools
+import gzip
+import http.client
+import threading
+import webbrowser
+
+import pytest
+
+from scripts import serve_quality_dashboard as dashboard
+
+INDEX_HTML = b"<!doctype html><html><body>" + b"QA dashboard " * 200 + b"</body></html>"
+
+
+@pytest.fixture
+def site(tmp_path):
+    """A minimal target/site tree with the dashboard and a binary asset."""
+    qa = tmp_path / "qa-dashboard"
+    qa.mkdir()
+    (qa / "index.html").write_bytes(INDEX_HTML)
+    (qa / "metrics.json").write_text('{"tests": {"total": 3}}', encoding="utf-8")
+    (qa / "logo.png").write_bytes(b"\x89PNG" + bytes(range(256)))
+    (qa / "empty.txt").write_bytes(b"")
+    return tmp_path
+
+
+@contextlib.contextmanager
+def _serve(site):
+    """Serve ``site`` on an ephemeral loopback port; yields a connection factory."""
+    routes = dashboard.preload_site(site)
+    handler = functools.partial(dashboard.DashboardRequestHandler, routes=routes)
+    httpd = dashboard.DashboardServer.from_socket(dashboard.pick_port(0), handler)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    port = httpd.server_address[1]
+    try:
+        yield lambda: http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+@pytest.fixture
+def server(site):
+    """The site served by a running DashboardServer."""
+    with _serve(site) as connect:
+        yield connect
+
+
+def _get(connect, path, headers=None, method="GET"):
+    conn = connect()
+    try:
+        conn.request(method, path, headers=headers or {})
+        response = conn.getresponse()
+        return response, response.read()
+    finally:
+        conn.close()
+
+
+class TestParseArgs:
+    """Tests for the hand-rolled argument parser."""
+
+    def test_defaults(self):
+        """No arguments serve target/site on an automatic port."""
+        args = dashboard.parse_args([])
+        assert args.path == dashboard.DEFAULT_SITE
+        assert args.port == 0
+
+    @pytest.mark.parametrize(
+        "argv",
+        [["--path", "site", "--port", "8080"], ["--path=site", "--port=8080"], ["--port", "8080", "--path=site"]],
+    )
+    def test_separate_and_inline_values(self, argv):
+        """Both ``--opt value`` and ``--opt=value`` forms are accepted."""
+        args = dashboard.parse_args(argv)
+        assert args.path == dashboard.Path("site")
+        assert args.port == 8080
+
+    @pytest.mark.parametrize("argv", [["--port", "abc"], ["--path"], ["--verbose"], ["site"]])
+    def test_invalid_arguments_exit_2(self, argv, capsys):
+        """Errors print usage to stderr and exit with status 2."""
+        with pytest.raises(SystemExit) as excinfo:
+            dashboard.parse_args(argv)
+        assert excinfo.value.code == 2
+        assert capsys.readouterr().err.startswith("usage:")
+
+    def test_help_exits_0(self, capsys):
+        """-h prints the usage text to stdout."""
+        with pytest.raises(SystemExit) as excinfo:
+            dashboard.parse_args(["-h"])
+        assert excinfo.value.code == 0
+        assert "--port PORT" in capsys.readouterr().out
+
+
+class TestPickPort:
+    """Tests for pick_port."""
+
+    def test_returns_bound_loopback_socket(self):
+        """Port 0 yields a socket already bound to an ephemeral loopback port."""
+        with dashboard.pick_port(0) as sock:
+            host, port = sock.getsockname()
+            assert host == "127.0.0.1"
+            assert port > 0
+
+    def test_taken_port_raises(self):
+        """A port that is already listening cannot be picked again."""
+        with dashboard.pick_port(0) as taken:
+            taken.listen()
+            with pytest.raises(OSError):
+                dashboard.pick_port(taken.getsockname()[1]).close()
+
+
+class TestPreloadSite:
+    """Tests for preload_site."""
+
+    def test_keys_are_url_paths(self, site):
+        """Every file is keyed by its URL path relative to the site root."""
+        routes = dashboard.preload_site(site)
+        assert "/qa-dashboard/index.html" in routes
+        assert "/qa-dashboard/metrics.json" in routes
+
+    def test_text_is_precompressed_and_binary_is_not(self, site):
+        """Compressible text gets a gzip variant; PNG data does not."""
+        routes = dashboard.preload_site(site)
+        assert gzip.decompress(routes["/qa-dashboard/index.html"].gzip) == INDEX_HTML
+        assert routes["/qa-dashboard/logo.png"].gzip is None
+
+    def test_content_type_and_etag(self, site):
+        """Entries carry their content type and a quoted ETag."""
+        entry = dashboard.preload_site(site)["/qa-dashboard/index.html"]
+        assert entry.content_type == "text/html"
+        assert entry.etag.startswith('"') and entry.etag.endswith('"')
+
+    def test_javascript_is_served_as_module_type(self, site):
+        """After init_mimetypes, bundles get a type browsers accept for ES modules."""
+        (site / "qa-dashboard" / "app.js").write_text("export default 1;", encoding="utf-8")
+        dashboard.init_mimetypes()
+        assert dashboard.preload_site(site)["/qa-dashboard/app.js"].content_type == "text/javascript"
+
+    def test_empty_files_are_served_as_empty_bodies(self, site):
+        """Zero-length files cannot be mmapped but are still preloaded."""
+        assert dashboard.preload_site(site)["/qa-dashboard/empty.txt"].body == b""
+
+    def test_directories_resolve_to_index(self, site):
+        """A directory's trailing-slash path shares its index.html entry."""
+        routes = dashboard.preload_site(site)
+        assert routes["/qa-dashboard/"] is routes["/qa-dashboard/index.html"]
+
+    def test_oversized_files_are_not_loaded(self, site, monkeypatch):
+        """Files above the preload limit keep only their path and size."""
+        monkeypatch.setattr(dashboard, "PRELOAD_MAX_BYTES", 100)
+        entry = dashboard.preload_site(site)["/qa-dashboard/logo.png"]
+        assert entry.body is None
+        assert entry.size == 260
+
+
+class TestCanonicalPath:
+    """Tests for canonical_path."""
+
+    @pytest.mark.parametrize(
+        "raw, expected",
+        [
+            ("/qa-dashboard/index.html?v=1#top", "/qa-dashboard/index.html"),
+            ("/qa-dashboard/./metrics%2Ejson", "/qa-dashboard/metrics.json"),
+            ("/qa-dashboard//assets/./app.js", "/qa-dashboard/assets/app.js"),
+            ("/qa-dashboard/", "/qa-dashboard/"),
+            ("/", "/"),
+        ],
+    )
+    def test_normalises_to_route_keys(self, raw, expected):
+        """Queries, escapes and dot segments collapse to the route-map key."""
+        assert dashboard.canonical_path(raw) == expected
+
+    @pytest.mark.parametrize("raw", ["/../etc/passwd", "/%2e%2e/secret", "/qa-dashboard/assets/../index.html", ".."])
+    def test_rejects_escapes(self, raw):
+        """Any dot-dot segment, encoded or not, is refused."""
+        assert dashboard.canonical_path(raw) is None
+
+
+class TestParseByteRange:
+    """Tests for parse_byte_range."""
+
+    @pytest.mark.parametrize(
+        "header, expected",
+        [
+            ("bytes=0-9", (0, 9)),
+            ("bytes=250-", (250, 259)),
+            ("bytes=-10", (250, 259)),
+            ("bytes=100-9999", (100, 259)),
+            ("bytes=-1000", (0, 259)),
+        ],
+    )
+    def test_satisfiable_ranges(self, header, expected):
+        """Closed, open-ended and suffix ranges are clamped to the body."""
+        assert dashboard.parse_byte_range(header, 260) == expected
+
+    @pytest.mark.parametrize("header", ["items=0-1", "bytes=5-1", "bytes=0-1,5-6", "bytes=x-", "bytes=-"])
+    def test_ignored_ranges(self, header):
+        """Malformed, foreign-unit and multi-range headers fall back to a full body."""
+        assert dashboard.parse_byte_range(header, 260) is None
+
+    @pytest.mark.parametrize("header, size", [("bytes=260-", 260), ("bytes=-0", 260), ("bytes=0-", 0)])
+    def test_unsatisfiable_ranges(self, header, size):
+        """Ranges starting past the end raise ValueError."""
+        with pytest.raises(ValueError):
+            dashboard.parse_byte_range(header, size)
+
+
+class TestDashboardRequestHandler:
+    """Tests for serving preloaded entries."""
+
+    def test_serves_identity_body(self, server):
+        """Without Accept-Encoding the raw bytes are returned."""
+        response, body = _get(server, "/qa-dashboard/index.html")
+        assert response.status == 200
+        assert body == INDEX_HTML
+        assert response.getheader("Content-Type") == "text/html"
+        assert response.getheader("Content-Encoding") is None
+
+    def test_serves_gzip_when_accepted(self, server):
+        """Clients that accept gzip get the precompressed variant."""
+        response, body = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip"})
+        assert response.getheader("Content-Encoding") == "gzip"
+        assert response.getheader("Vary") == "Accept-Encoding"
+        assert gzip.decompress(body) == INDEX_HTML
+
+    def test_prefers_brotli_over_gzip(self, server):
+        """Brotli wins when both are accepted and the module is installed."""
+        brotli = pytest.importorskip("brotli")
+        response, body = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip, deflate, br"})
+        assert response.getheader("Content-Encoding") == "br"
+        assert brotli.decompress(body) == INDEX_HTML
+
+    def test_refused_encodings_are_not_used(self, server):
+        """q=0 refuses a coding even when a variant exists."""
+        response, body = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "br;q=0, gzip;q=0"})
+        assert response.getheader("Content-Encoding") is None
+        assert body == INDEX_HTML
+
+    def test_query_string_is_ignored(self, server):
+        """Cache-busting query strings resolve to the same file."""
+        response, body = _get(server, "/qa-dashboard/metrics.json?v=123")
+        assert response.status == 200
+        assert body == b'{"tests": {"total": 3}}'
+
+    def test_directory_serves_index(self, server):
+        """The directory URL returns its index.html."""
+        response, body = _get(server, "/qa-dashboard/")
+        assert response.status == 200
+        assert body == INDEX_HTML
+
+    def test_directory_without_slash_redirects(self, server):
+        """A bare directory path redirects to the trailing-slash form."""
+        response, _ = _get(server, "/qa-dashboard")
+        assert response.status == 301
+        assert response.getheader("Location") == "/qa-dashboard/"
+
+    def test_unknown_path_is_404(self, server):
+        """Paths outside the route map are not looked up on disk."""
+        response, _ = _get(server, "/qa-dashboard/missing.html")
+        assert response.status == 404
+
+    def test_traversal_is_rejected(self, server):
+        """Dot-dot escapes get a 400 instead of a lookup."""
+        response, _ = _get(server, "/qa-dashboard/%2e%2e/%2e%2e/etc/passwd")
+        assert response.status == 400
+
+    def test_large_bodies_are_written_after_headers(self, site, monkeypatch):
+        """Bodies above the single-write limit are still delivered intact."""
+        monkeypatch.setattr(dashboard, "SINGLE_WRITE_MAX_BYTES", 16)
+        with _serve(site) as connect:
+            response, body = _get(connect, "/qa-dashboard/index.html")
+            ranged, part = _get(connect, "/qa-dashboard/logo.png", {"Range": "bytes=0-99"})
+        assert body == INDEX_HTML
+        assert ranged.status == 206 and len(part) == 100
+
+    def test_minimal_server_and_date_headers(self, server):
+        """Server is a fixed token and Date is a valid HTTP date."""
+        response, _ = _get(server, "/qa-dashboard/metrics.json")
+        assert response.getheader("Server") == "qa-preview"
+        assert email.utils.parsedate_to_datetime(response.getheader("Date")) is not None
+
+    def test_only_errors_are_logged(self, server, capfd):
+        """Successful requests are silent; errors still reach stderr."""
+        _get(server, "/qa-dashboard/index.html")
+        _get(server, "/qa-dashboard/missing.html")
+        err = capfd.readouterr().err
+        assert "index.html" not in err
+        assert "code 404" in err
+
+    def test_oversized_file_is_streamed(self, site, monkeypatch):
+        """Files that were not preloaded are sent from disk with the right length."""
+        monkeypatch.setattr(dashboard, "PRELOAD_MAX_BYTES", 100)
+        with _serve(site) as connect:
+            response, body = _get(connect, "/qa-dashboard/logo.png")
+        assert response.status == 200
+        assert response.getheader("Content-Length") == "260"
+        assert body == (site / "qa-dashboard" / "logo.png").read_bytes()
+
+    def test_head_has_length_but_no_body(self, server):
+        """HEAD reports the body length without sending it."""
+        response, body = _get(server, "/qa-dashboard/logo.png", method="HEAD")
+        assert response.status == 200
+        assert response.getheader("Content-Length") == "260"
+        assert body == b""
+
+    def test_connection_is_reused_across_requests(self, server):
+        """HTTP/1.1 keep-alive serves several assets over one socket."""
+        conn = server()
+        try:
+            conn.request("GET", "/qa-dashboard/index.html")
+            first = conn.getresponse()
+            first.read()
+            sock = conn.sock
+            conn.request("GET", "/qa-dashboard/metrics.json")
+            second = conn.getresponse()
+            second.read()
+            assert second.status == 200
+            assert conn.sock is sock
+        finally:
+            conn.close()
+
+
+class TestRangeRequests:
+    """Tests for 206 / 416 handling."""
+
+    def test_full_responses_advertise_ranges(self, server):
+        """200 responses carry Accept-Ranges: bytes."""
+        response, _ = _get(server, "/qa-dashboard/logo.png")
+        assert response.getheader("Accept-Ranges") == "bytes"
+
+    def test_range_returns_partial_content(self, server):
+        """A satisfiable range returns exactly that slice with Content-Range."""
+        response, body = _get(server, "/qa-dashboard/logo.png", {"Range": "bytes=4-7"})
+        assert response.status == 206
+        assert response.getheader("Content-Range") == "bytes 4-7/260"
+        assert body == bytes(range(4))
+
+    def test_range_ignores_compression(self, server):
+        """Ranges address the identity body even when gzip is accepted."""
+        response, body = _get(server, "/qa-dashboard/index.html", {"Range": "bytes=0-14", "Accept-Encoding": "gzip"})
+        assert response.status == 206
+        assert response.getheader("Content-Encoding") is None
+        assert body == INDEX_HTML[:15]
+
+    def test_unsatisfiable_range_is_416(self, server):
+        """A range past the end is refused with the full size."""
+        response, _ = _get(server, "/qa-dashboard/logo.png", {"Range": "bytes=1000-"})
+        assert response.status == 416
+        assert response.getheader("Content-Range") == "bytes */260"
+
+    def test_stale_if_range_returns_full_body(self, server):
+        """A mismatched If-Range validator ignores the Range header."""
+        response, body = _get(server, "/qa-dashboard/logo.png", {"Range": "bytes=0-3", "If-Range": '"stale"'})
+        assert response.status == 200
+        assert len(body) == 260
+
+    def test_compressed_variant_etag_does_not_match_if_range(self, server):
+        """Resuming with a gzip variant's ETag gets the full body, not identity bytes."""
+        first, _ = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip"})
+        gzip_etag = first.getheader("ETag")
+        response, body = _get(server, "/qa-dashboard/index.html", {"Range": "bytes=10-20", "If-Range": gzip_etag})
+        assert response.status == 200
+        assert body == INDEX_HTML
+
+    def test_identity_etag_matches_if_range(self, server):
+        """The identity ETag still validates a resumed range."""
+        first, _ = _get(server, "/qa-dashboard/index.html")
+        response, body = _get(
+            server, "/qa-dashboard/index.html", {"Range": "bytes=10-20", "If-Range": first.getheader("ETag")}
+        )
+        assert response.status == 206
+        assert body == INDEX_HTML[10:21]
+
+    def test_range_of_oversized_file(self, site, monkeypatch):
+        """Files streamed from disk honour ranges too."""
+        monkeypatch.setattr(dashboard, "PRELOAD_MAX_BYTES", 100)
+        with _serve(site) as connect:
+            response, body = _get(connect, "/qa-dashboard/logo.png", {"Range": "bytes=-4"})
+        assert response.status == 206
+        assert body == bytes(range(252, 256))
+
+
+class TestConditionalRequests:
+    """Tests for 304 handling."""
+
+    def test_matching_etag_returns_304(self, server):
+        """If-None-Match with the current ETag short-circuits the body."""
+        first, _ = _get(server, "/qa-dashboard/index.html")
+        etag = first.getheader("ETag")
+        response, body = _get(server, "/qa-dashboard/index.html", {"If-None-Match": etag})
+        assert response.status == 304
+        assert response.getheader("ETag") == etag
+        assert body == b""
+
+    def test_variants_have_distinct_etags(self, server):
+        """gzip and identity responses carry different strong validators."""
+        identity, _ = _get(server, "/qa-dashboard/index.html")
+        gzipped, _ = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip"})
+        assert identity.getheader("ETag") != gzipped.getheader("ETag")
+
+    def test_variant_etag_returns_304(self, server):
+        """A cached gzip copy revalidates with its own ETag."""
+        first, _ = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip"})
+        etag = first.getheader("ETag")
+        response, _ = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert response.status == 304
+        assert response.getheader("ETag") == etag
+
+    def test_variant_etag_does_not_validate_other_coding(self, server):
+        """A gzip tag sent by a client that accepts no coding gets the identity body."""
+        first, _ = _get(server, "/qa-dashboard/index.html", {"Accept-Encoding": "gzip"})
+        response, body = _get(server, "/qa-dashboard/index.html", {"If-None-Match": first.getheader("ETag")})
+        assert response.status == 200
+        assert response.getheader("Content-Encoding") is None
+        assert body == INDEX_HTML
+
+    def test_stale_etag_returns_full_body(self, server):
+        """A different ETag gets the full response, even with a fresh If-Modified-Since."""
+        first, _ = _get(server, "/qa-dashboard/index.html")
+        response, body = _get(
+            server,
+            "/qa-dashboard/index.html",
+            {"If-None-Match": '"stale"', "If-Modified-Since": first.getheader("Last-Modified")},
+        )
+        assert response.status == 200
+        assert body == INDEX_HTML
+
+    def test_if_modified_since_returns_304(self, server):
+        """If-Modified-Since at or after the file mtime returns 304."""
+        first, _ = _get(server, "/qa-dashboard/metrics.json")
+        response, _ = _get(
+            server, "/qa-dashboard/metrics.json", {"If-Modified-Since": first.getheader("Last-Modified")}
+        )
+        assert response.status == 304
+
+    def test_old_if_modified_since_returns_full_body(self, server):
+        """If-Modified-Since before the mtime returns the body."""
+        response, _ = _get(
+            server, "/qa-dashboard/metrics.json", {"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}
+        )
+        assert response.status == 200
+
+
+class TestCacheControl:
+    """Tests for Cache-Control selection at preload."""
+
+    @pytest.mark.parametrize(
+        "relative",
+        [
+            "qa-dashboard/assets/index-BxT3k9aQ.js",
+            "css/maven-base.css",
+            "images/logo.png",
+            "js/app.3f2a9c1d0b.js",
+        ],
+    )
+    def test_fingerprinted_assets_are_immutable(self, site, relative):
+        """Hashed names and static asset folders get a long immutable max-age."""
+        path = site / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"asset")
+        entry = dashboard.preload_site(site)["/" + relative]
+        assert entry.cache_control == dashboard.CACHE_IMMUTABLE
+
+    @pytest.mark.parametrize("url_path", ["/qa-dashboard/index.html", "/qa-dashboard/metrics.json"])
+    def test_documents_and_metrics_are_revalidated(self, site, url_path):
+        """Entry points and metrics must revalidate on every navigation."""
+        assert dashboard.preload_site(site)[url_path].cache_control == "no-cache"
+
+
+@pytest.mark.skipif(dashboard.os.name == "nt", reason="POSIX opener path")
+class TestOpenBrowser:
+    """Tests for open_browser."""
+
+    def test_spawns_desktop_opener(self, monkeypatch):
+        """When the opener is on PATH it is spawned in its own session and reaped."""
+        calls = []
+        reaped = threading.Event()
+
+        def fake_spawn(*args, **kwargs):
+            calls.append((args, kwargs))
+            return 4242
+
+        def fake_waitpid(pid, options):
+            assert (pid, options) == (4242, 0)
+            reaped.set()
+            return pid, 0
+
+        monkeypatch.setattr(dashboard.shutil, "which", lambda name: f"/usr/bin/{name}")
+        monkeypatch.setattr(dashboard.os, "posix_spawnp", fake_spawn)
+        monkeypatch.setattr(dashboard.os, "waitpid", fake_waitpid)
+        dashboard.open_browser("http://127.0.0.1:1/")
+        (path, argv, _env), kwargs = calls[0]
+        assert argv == [path, "http://127.0.0.1:1/"]
+        assert kwargs == {"setsid": True}
+        assert reaped.wait(timeout=5)
+
+    def test_falls_back_to_webbrowser(self, monkeypatch):
+        """Without an opener the webbrowser module is used."""
+        opened = threading.Event()
+        monkeypatch.setattr(dashboard.shutil, "which", lambda name: None)
+        monkeypatch.setattr(webbrowser, "open", lambda url: opened.set())
+        dashboard.open_browser("http://127.0.0.1:1/")
+        assert opened.wait(timeout=5)